@@ -6,6 +6,95 @@ Interactive AI Writing Assistant for LibreOffice Writer
 import os
 import sys
 import time
+import atexit
+import random
+import string
+
+# Static system prompt, kept byte-identical across calls so OpenAI's
+# server-side prompt caching can reuse the processed prefix.
+SYSTEM_MESSAGE = ("You are a helpful writing assistant. Process the user's request and improve "
+                  "their text accordingly. Return only the improved text without quotes or "
+                  "additional commentary.")
+
+# Keyword → prompt template, built once at import time. Commands are
+# routed by hashing their tokens instead of re-scanning the whole string
+# for every known keyword.
+PROMPT_TEMPLATES = {
+    ("rewrite", "simpler"): "Rewrite this text to be clearer and simpler: {text}",
+    ("professional", "formal"): "Rewrite this text in a more professional tone: {text}",
+    ("example", "examples"): "Expand this text by adding relevant examples: {text}",
+    ("grammar", "fix"): "Fix any grammar, spelling, and punctuation errors: {text}",
+    ("summary", "summarize"): "Summarize this text concisely: {text}",
+}
+KEYWORD_TO_TEMPLATE = {keyword: template
+                       for keywords, template in PROMPT_TEMPLATES.items()
+                       for keyword in keywords}
+
+
+def build_prompt(command: str, text: str) -> str:
+    """Build the AI prompt for a user command via the keyword table"""
+    # Strip punctuation so "summarize." matches the same as "summarize".
+    for token in command.lower().split():
+        template = KEYWORD_TO_TEMPLATE.get(token.strip(string.punctuation))
+        if template:
+            return template.format(text=text)
+    return f"{command}. Text to process: {text}"
+
+
+# One shared HTTP connection pool for the whole process: TLS to
+# api.openai.com is handshaken once and kept alive across commands
+# instead of once per client construction.
+_HTTP = None
+
+
+def get_http_client():
+    """Get the process-wide pooled httpx.Client, creating it on first use"""
+    global _HTTP
+    if _HTTP is None:
+        import httpx
+        try:
+            # HTTP/2 multiplexes parallel requests over one connection,
+            # but needs the optional h2 package (pip install 'httpx[http2]').
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        # http2/limits must go on the transport: an explicit transport=
+        # makes httpx ignore those arguments on the Client itself.
+        transport = httpx.HTTPTransport(
+            retries=2, http2=http2,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+        _HTTP = httpx.Client(timeout=30.0, transport=transport)
+        atexit.register(_HTTP.close)
+    return _HTTP
+
+
+def call_with_retry(client, **kwargs):
+    """chat.completions.create with exponential backoff plus jitter.
+
+    Rate-limit and connection errors are transient; retrying with growing
+    randomized delays (honoring Retry-After when the server sends one)
+    rides them out instead of dumping an error into the session.
+    """
+    import openai
+    retryable = (openai.RateLimitError, openai.APIConnectionError)
+    for attempt in range(6):
+        try:
+            return client.chat.completions.create(**kwargs)
+        except retryable as e:
+            if attempt == 5:
+                raise
+            delay = None
+            try:
+                value = e.response.headers.get('retry-after')
+                delay = float(value) if value else None
+            except (AttributeError, ValueError):
+                pass
+            if delay is None:
+                delay = min(60.0, (2 ** attempt) * (1.0 + random.random()))
+            print(f"⏳ Transient API error, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
 
 def interactive_ai_session():
     """Interactive session for testing AI commands"""
@@ -13,9 +102,9 @@ def interactive_ai_session():
         import uno
         import openai
         
-        # Set up OpenAI client
+        # Set up OpenAI client over the shared connection pool
         api_key = os.getenv('OPENAI_API_KEY')
-        client = openai.OpenAI(api_key=api_key)
+        client = openai.OpenAI(api_key=api_key, http_client=get_http_client())
         
         # Connect to LibreOffice
         local_ctx = uno.getComponentContext()
@@ -28,7 +117,7 @@ def interactive_ai_session():
         desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
         doc = desktop.getCurrentComponent()
         
-        if not doc or not hasattr(doc, 'Text'):
+        if not doc or not doc.supportsService("com.sun.star.text.TextDocument"):
             print("❌ LibreOffice Writer not found!")
             return
         
@@ -77,24 +166,14 @@ def interactive_ai_session():
                 print("🤖 Processing with AI...")
                 
                 # Create AI prompt
-                if "rewrite" in command.lower() or "simpler" in command.lower():
-                    prompt = f"Rewrite this text to be clearer and simpler: {selected_text}"
-                elif "professional" in command.lower() or "formal" in command.lower():
-                    prompt = f"Rewrite this text in a more professional tone: {selected_text}"
-                elif "example" in command.lower():
-                    prompt = f"Expand this text by adding relevant examples: {selected_text}"
-                elif "grammar" in command.lower() or "fix" in command.lower():
-                    prompt = f"Fix any grammar, spelling, and punctuation errors: {selected_text}"
-                elif "summary" in command.lower() or "summarize" in command.lower():
-                    prompt = f"Summarize this text concisely: {selected_text}"
-                else:
-                    prompt = f"{command}. Text to process: {selected_text}"
+                prompt = build_prompt(command, selected_text)
                 
                 # Call OpenAI API
-                response = client.chat.completions.create(
+                response = call_with_retry(
+                    client,
                     model="gpt-3.5-turbo",
                     messages=[
-                        {"role": "system", "content": "You are a helpful writing assistant. Process the user's request and improve their text accordingly. Return only the improved text without quotes or additional commentary."},
+                        {"role": "system", "content": SYSTEM_MESSAGE},
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=500,
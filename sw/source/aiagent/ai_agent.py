@@ -8,17 +8,35 @@ import os
 import sys
 import time
 import json
+import string
+import atexit
 import socket
+import struct
+import pickle
+import asyncio
+import hashlib
 import threading
 import logging
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 
 try:
     import openai
+    import httpx
 except ImportError:
     print("OpenAI package not found. Install with: pip install openai")
     sys.exit(1)
 
+try:
+    import numpy
+except ImportError:
+    numpy = None  # semantic cache tier is disabled without numpy
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None  # token counts fall back to a chars/4 estimate
+
 try:
     import uno
     from com.sun.star.awt import XWindowListener
@@ -31,24 +49,287 @@ except ImportError:
     sys.exit(1)
 
 
+class ResponseCache:
+    """Two-tier LRU cache for OpenAI responses.
+
+    Tier 1 is an exact lookup on sha256(prompt template + text). Tier 2 is a
+    semantic fallback: the embedding of the new prompt is compared against the
+    embeddings of cached entries, and the cached completion is reused when the
+    best cosine similarity exceeds the threshold. The cache is bounded by both
+    entry count and total bytes, and is persisted to disk across runs.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024,
+                 similarity_threshold: float = 0.95, cache_path: str = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.similarity_threshold = similarity_threshold
+        self.cache_path = cache_path or os.path.join(
+            os.path.expanduser('~'), '.cache', 'ai-office', 'cache.pkl')
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (embedding | None, response)
+        self._bytes = 0
+        self._load()
+        atexit.register(self.save)
+
+    @staticmethod
+    def make_key(prompt: str) -> str:
+        """Compute the exact-match cache key for a prompt"""
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def get_exact(self, key: str) -> Optional[str]:
+        """Return the cached response for an exact key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def get_semantic(self, embedding) -> Optional[str]:
+        """Return the cached response whose embedding is most similar, or None"""
+        if numpy is None or embedding is None:
+            return None
+        with self._lock:
+            candidates = [(key, emb, resp) for key, (emb, resp)
+                          in self._entries.items() if emb is not None]
+            if not candidates:
+                return None
+            # Embeddings are stored normalized, so a single batched dot
+            # product gives cosine similarities directly.
+            matrix = numpy.vstack([emb for _, emb, _ in candidates])
+            similarities = matrix @ numpy.asarray(embedding)
+            best = int(similarities.argmax())
+            if similarities[best] < self.similarity_threshold:
+                return None
+            key = candidates[best][0]
+            self._entries.move_to_end(key)
+            return candidates[best][2]
+
+    def put(self, key: str, embedding, response: str):
+        """Store a response, evicting least-recently-used entries as needed"""
+        if numpy is not None and embedding is not None:
+            embedding = numpy.asarray(embedding)
+            norm = numpy.linalg.norm(embedding)
+            if norm > 0:
+                embedding = embedding / norm
+        else:
+            embedding = None
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entry_bytes(self._entries.pop(key))
+            entry = (embedding, response)
+            self._entries[key] = entry
+            self._bytes += self._entry_bytes(entry)
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._entry_bytes(evicted)
+
+    @staticmethod
+    def _entry_bytes(entry) -> int:
+        embedding, response = entry
+        size = len(response.encode('utf-8'))
+        if embedding is not None:
+            size += embedding.nbytes
+        return size
+
+    def _load(self):
+        """Load persisted cache entries from disk, if present"""
+        # A stale or foreign cache file can raise almost anything out of
+        # pickle.load (ModuleNotFoundError for entries pickled with numpy
+        # installed, UnicodeDecodeError on corrupt data, ...); this runs
+        # in __init__, so never let a bad cache take the service down —
+        # just start empty.
+        try:
+            with open(self.cache_path, 'rb') as f:
+                entries = pickle.load(f)
+            for key, (embedding, response) in entries.items():
+                self.put(key, embedding, response)
+        except Exception:
+            pass
+
+    def save(self):
+        """Persist cache entries to disk"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with self._lock:
+                entries = dict(self._entries)
+            with open(self.cache_path, 'wb') as f:
+                pickle.dump(entries, f)
+        except (OSError, pickle.PickleError):
+            pass
+
+
+class RateLimiter:
+    """Proactive client-side rate limiter for the OpenAI API.
+
+    Maintains leaky-bucket budgets for requests per minute and tokens per
+    minute, refilled continuously and re-synced from the x-ratelimit-*
+    response headers, so concurrent clients are throttled locally before
+    the server has to answer with a 429.
+    """
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 80000):
+        self.request_limit = requests_per_minute
+        self.token_limit = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(float(self.request_limit),
+                             self._requests + elapsed * self.request_limit / 60.0)
+        self._tokens = min(float(self.token_limit),
+                           self._tokens + elapsed * self.token_limit / 60.0)
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait until there is budget for one request of the given size"""
+        while True:
+            async with self._lock:
+                self._refill()
+                # The bucket never holds more than token_limit, so an
+                # estimate above it could never be satisfied and would spin
+                # forever; clamp so an oversized request just waits for a
+                # full bucket. Re-clamped each pass because headers can
+                # lower token_limit at runtime.
+                needed = min(float(estimated_tokens), float(self.token_limit))
+                if self._requests >= 1.0 and self._tokens >= needed:
+                    self._requests -= 1.0
+                    self._tokens -= needed
+                    return
+                # Sleep exactly as long as the emptier bucket needs to refill
+                # instead of backing off blindly.
+                request_wait = (1.0 - self._requests) * 60.0 / self.request_limit
+                token_wait = (needed - self._tokens) * 60.0 / self.token_limit
+            # Sleep outside the lock so one large request doesn't block
+            # every other caller from even checking its budget.
+            await asyncio.sleep(max(request_wait, token_wait, 0.01))
+
+    def update_from_headers(self, headers):
+        """Re-sync bucket limits and levels from x-ratelimit response headers"""
+        try:
+            limit_requests = headers.get("x-ratelimit-limit-requests")
+            limit_tokens = headers.get("x-ratelimit-limit-tokens")
+            remaining_requests = headers.get("x-ratelimit-remaining-requests")
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            if limit_requests:
+                self.request_limit = int(limit_requests)
+            if limit_tokens:
+                self.token_limit = int(limit_tokens)
+            if remaining_requests:
+                self._requests = min(self._requests, float(remaining_requests))
+            if remaining_tokens:
+                self._tokens = min(self._tokens, float(remaining_tokens))
+        except (TypeError, ValueError):
+            pass
+
+
+# Default path for the AF_UNIX transport; same-host IPC over a domain
+# socket skips the TCP stack (handshake, checksums, Nagle) entirely.
+DEFAULT_SOCKET_PATH = "/tmp/ai-office.sock"
+
+
+# Static system prompt, hoisted to module scope and kept byte-identical
+# across calls so OpenAI's server-side prompt caching can reuse the
+# processed prefix; variable content belongs only in the user turn.
+SYSTEM_MESSAGE = ("You are an AI writing assistant integrated into LibreOffice Writer. "
+                  "Help users improve their documents by rewriting, editing, and enhancing text. "
+                  "Provide clear, concise responses.")
+
+# Prompt templates, assembled once at import time instead of re-built as
+# f-strings per call. Constant wording also keeps the stable prefix of
+# each request byte-identical, which feeds OpenAI's prompt cache.
+PROMPT_REWRITE_SIMPLE = "Rewrite this text in simpler words"
+PROMPT_REWRITE_FORMAL = "Rewrite this text in a more formal tone"
+PROMPT_REWRITE_CASUAL = "Rewrite this text in a more casual tone"
+PROMPT_REWRITE_DEFAULT = "Improve and rewrite this text"
+PROMPT_EXPAND = "Expand and elaborate on this text with more details"
+PROMPT_CORRECT = "Correct any grammar, spelling, and punctuation errors in this text"
+PROMPT_SUMMARIZE = "Summarize this text concisely: {text}"
+PROMPT_COMBINE_SUMMARIES = "Combine these section summaries into one concise summary: {text}"
+PROMPT_BATCH = "{instruction}. Apply this to each numbered passage:\n{passages}"
+
+
+_encoding = None
+
+
+def _count_tokens(text: str) -> int:
+    """Count tokens for the chat model, estimating chars/4 without tiktoken"""
+    global _encoding
+    if tiktoken is None:
+        return len(text) // 4
+    if _encoding is None:
+        _encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+    return len(_encoding.encode(text))
+
+
+# Output-token budget relative to input length per command type: rewrites
+# and corrections stay about the same length, summaries shrink, expansions
+# grow.
+_BUDGET_FACTORS = {
+    "rewrite": 1.2,
+    "correct": 1.2,
+    "summarize": 0.4,
+    "expand": 3.0,
+}
+
+
+def budget_for(task: str, input_text: str, minimum: int = 100, maximum: int = 3000) -> int:
+    """Compute an output-token budget for a task from its input length.
+
+    A hard-coded max_tokens either over-allocates — the full reservation
+    counts against the TPM rate limit and lets the model ramble — or
+    truncates long inputs; scaling with the input avoids both.
+    """
+    factor = _BUDGET_FACTORS.get(task, 1.5)
+    tokens = int(_count_tokens(input_text) * factor)
+    return max(minimum, min(tokens, maximum))
+
+
 class AIAgentService:
     """Main AI Agent service that handles communication with LibreOffice Writer"""
-    
-    def __init__(self, openai_api_key: str = None, port: int = 8765):
+
+    def __init__(self, openai_api_key: str = None, port: int = 8765,
+                 socket_path: str = DEFAULT_SOCKET_PATH, use_tcp: bool = False):
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         if not self.openai_api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass it directly.")
         
-        # Initialize OpenAI client
-        openai.api_key = self.openai_api_key
-        
+        # One process-wide async client driven by a persistent background
+        # event loop: the httpx pool underneath keeps the TLS connection to
+        # the API alive across commands instead of handshaking every time.
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        # Pool sized for the socket server's concurrency: enough parallel
+        # connections that simultaneous client commands are not serialized
+        # behind one in-flight request.
+        self.client = openai.AsyncOpenAI(
+            api_key=self.openai_api_key,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)))
+
         self.port = port
+        self.socket_path = socket_path
+        # Domain sockets are not available on Windows, so fall back to TCP
+        # loopback there or when explicitly requested.
+        self.use_unix_socket = hasattr(socket, 'AF_UNIX') and not use_tcp
         self.running = False
         self.socket_server = None
+        self.response_cache = ResponseCache()
+        self.rate_limiter = RateLimiter()
+        self._inflight: Dict[str, asyncio.Future] = {}
         self.uno_context = None
+        self._sm = None
+        self._services = {}
         self.desktop = None
         self.current_doc = None
-        
+        self._controller_cache = None
+
         # Setup logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -73,55 +354,130 @@ class AIAgentService:
                 self.logger.warning("Could not connect to LibreOffice on port 2002. Make sure LibreOffice is running with: soffice --writer --accept='socket,host=localhost,port=2002;urp;StarOffice.ServiceManager' --nologo --nodefault --nolockcheck --norestore")
                 return
             
-            self.desktop = self.uno_context.ServiceManager.createInstanceWithContext(
-                "com.sun.star.frame.Desktop", self.uno_context)
-            
+            # Cache the remote ServiceManager so later service lookups do
+            # not re-traverse the bridge attribute by attribute, and resolve
+            # the frequently used services once up front — each
+            # createInstanceWithContext string lookup is a cross-process call.
+            self._sm = self.uno_context.ServiceManager
+            self._services = {
+                name: self._sm.createInstanceWithContext(name, self.uno_context)
+                for name in ("com.sun.star.frame.Desktop",
+                             "com.sun.star.frame.DispatchHelper")
+            }
+            self.desktop = self._services["com.sun.star.frame.Desktop"]
+
         except Exception as e:
             self.logger.error(f"Failed to connect to LibreOffice: {e}")
-    
+
+    def get_service(self, name: str):
+        """Get a UNO service instance, resolved and cached on first use"""
+        if name not in self._services:
+            self._services[name] = self._sm.createInstanceWithContext(name, self.uno_context)
+        return self._services[name]
+
+    def _reset_uno_connection(self):
+        """Drop all cached UNO references after a bridge failure"""
+        self.uno_context = None
+        self._sm = None
+        self._services = {}
+        self.desktop = None
+        self.current_doc = None
+        self._controller_cache = None
+
+    def _ensure_connected(self) -> bool:
+        """Connect to LibreOffice if the bridge is not currently up"""
+        if self.desktop is None:
+            self._connect_to_libreoffice()
+        return self.desktop is not None
+
     def get_current_document(self):
         """Get the currently active Writer document"""
-        if not self.desktop:
+        if not self._ensure_connected():
             return None
-        
+
         try:
             doc = self.desktop.getCurrentComponent()
-            if doc and hasattr(doc, 'Text'):  # Check if it's a Writer document
-                self.current_doc = doc
-                return doc
-        except Exception as e:
-            self.logger.error(f"Failed to get current document: {e}")
-        
+        except Exception:
+            # The bridge dropped since the last call (LibreOffice restarted
+            # or the document was closed): reconnect once and retry.
+            self.logger.warning("UNO bridge connection lost; reconnecting")
+            self._reset_uno_connection()
+            if not self._ensure_connected():
+                return None
+            try:
+                doc = self.desktop.getCurrentComponent()
+            except Exception as e:
+                self.logger.error(f"Failed to get current document: {e}")
+                return None
+
+        if doc and doc.supportsService("com.sun.star.text.TextDocument"):
+            if self.current_doc != doc:
+                # Another document came to front: the cached controller
+                # belongs to the old one, so drop it.
+                self._controller_cache = None
+            self.current_doc = doc
+            return doc
+
         return None
+
+    def _get_controller(self):
+        """Get the current document's controller, cached until the document changes.
+
+        getCurrentController is a cross-process UNO round-trip; reusing the
+        cached reference saves that call on every text operation.
+        """
+        doc = self.get_current_document()
+        if not doc:
+            return None
+
+        if self._controller_cache is None:
+            try:
+                self._controller_cache = doc.getCurrentController()
+            except Exception as e:
+                self.logger.error(f"Failed to get current controller: {e}")
+
+        return self._controller_cache
     
     def get_selected_text(self) -> Optional[str]:
         """Get currently selected text from the document"""
-        doc = self.get_current_document()
-        if not doc:
+        controller = self._get_controller()
+        if not controller:
             return None
-        
+
         try:
-            controller = doc.getCurrentController()
             selection = controller.getSelection()
-            
+
             if selection.getCount() > 0:
                 text_range = selection.getByIndex(0)
                 return text_range.getString()
         except Exception as e:
             self.logger.error(f"Failed to get selected text: {e}")
-        
+
         return None
+
+    def get_selected_ranges(self) -> list:
+        """Get all currently selected text ranges from the document"""
+        controller = self._get_controller()
+        if not controller:
+            return []
+
+        try:
+            selection = controller.getSelection()
+            return [selection.getByIndex(i) for i in range(selection.getCount())]
+        except Exception as e:
+            self.logger.error(f"Failed to get selected ranges: {e}")
+
+        return []
     
     def replace_selected_text(self, new_text: str) -> bool:
         """Replace currently selected text with new text"""
-        doc = self.get_current_document()
-        if not doc:
+        controller = self._get_controller()
+        if not controller:
             return False
-        
+
         try:
-            controller = doc.getCurrentController()
             selection = controller.getSelection()
-            
+
             if selection.getCount() > 0:
                 text_range = selection.getByIndex(0)
                 text_range.setString(new_text)
@@ -133,12 +489,11 @@ class AIAgentService:
     
     def insert_text_at_cursor(self, text: str) -> bool:
         """Insert text at current cursor position"""
-        doc = self.get_current_document()
-        if not doc:
+        controller = self._get_controller()
+        if not controller:
             return False
-        
+
         try:
-            controller = doc.getCurrentController()
             cursor = controller.getViewCursor()
             cursor.setString(text)
             return True
@@ -147,90 +502,304 @@ class AIAgentService:
         
         return False
     
-    def get_document_text(self) -> Optional[str]:
-        """Get all text from the current document"""
+    def _iter_paragraphs(self):
+        """Lazily yield paragraph strings from the current document"""
         doc = self.get_current_document()
         if not doc:
-            return None
-        
+            return
+
         try:
-            text = doc.getText()
-            return text.getString()
+            enumeration = doc.getText().createEnumeration()
+            while enumeration.hasMoreElements():
+                paragraph = enumeration.nextElement()
+                if paragraph.supportsService("com.sun.star.text.Paragraph"):
+                    yield paragraph.getString()
         except Exception as e:
-            self.logger.error(f"Failed to get document text: {e}")
-        
-        return None
+            self.logger.error(f"Failed to enumerate paragraphs: {e}")
+
+    # Token budget per summarization chunk, comfortably inside the model's
+    # context window with room for the instruction and the summary itself
+    SUMMARIZE_CHUNK_TOKENS = 3000
+
+    def _collect_text_chunks(self, chunk_tokens: int = SUMMARIZE_CHUNK_TOKENS) -> list:
+        """Gather the document's paragraphs into chunks of bounded token size"""
+        chunks = []
+        current = []
+        current_tokens = 0
+        for paragraph in self._iter_paragraphs():
+            paragraph_tokens = _count_tokens(paragraph) + 1
+            if current and current_tokens + paragraph_tokens > chunk_tokens:
+                chunks.append("\n".join(current))
+                current = []
+                current_tokens = 0
+            current.append(paragraph)
+            current_tokens += paragraph_tokens
+        if current and any(paragraph.strip() for paragraph in current):
+            chunks.append("\n".join(current))
+        return chunks
+
+    async def _summarize_chunks(self, chunks: list) -> Optional[str]:
+        """Summarize pre-chunked document text.
+
+        A single chunk is summarized directly. Larger documents go through
+        map-reduce: the chunks are summarized concurrently and the partial
+        summaries are then condensed with one more call, keeping prompt
+        size bounded no matter how long the document is.
+        """
+        if len(chunks) == 1:
+            return await self.call_openai_api(PROMPT_SUMMARIZE.format(text=chunks[0]),
+                                              max_tokens=budget_for("summarize", chunks[0]))
+
+        partials = await asyncio.gather(
+            *[self.call_openai_api(PROMPT_SUMMARIZE.format(text=chunk),
+                                   max_tokens=budget_for("summarize", chunk))
+              for chunk in chunks])
+        if not all(partials):
+            return None
+
+        combined = "\n\n".join(partials)
+        return await self.call_openai_api(
+            PROMPT_COMBINE_SUMMARIES.format(text=combined),
+            max_tokens=budget_for("summarize", combined))
+
+    def get_document_text(self) -> Optional[str]:
+        """Get all text from the current document.
+
+        Kept as a convenience for callers that really need everything at
+        once; it joins the lazy paragraph enumeration, so anything that can
+        process text incrementally should iterate _iter_paragraphs directly
+        instead of marshalling the whole document across the bridge.
+        """
+        paragraphs = list(self._iter_paragraphs())
+        if not paragraphs:
+            return None
+        return "\n".join(paragraphs)
     
-    async def call_openai_api(self, prompt: str, context: str = "", max_tokens: int = 1000) -> Optional[str]:
-        """Call OpenAI API with the given prompt"""
+    def _run_async(self, coro):
+        """Run a coroutine on the persistent event loop and wait for the result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _get_prompt_embedding(self, prompt: str):
+        """Get an embedding for the semantic cache tier, or None on failure"""
+        if numpy is None:
+            return None
+        try:
+            response = await self.client.embeddings.create(
+                model="text-embedding-3-small", input=prompt)
+            return response.data[0].embedding
+        except Exception as e:
+            self.logger.debug(f"Embedding lookup failed: {e}")
+            return None
+
+    def _log_prompt_cache_usage(self, response):
+        """Log how much of the prompt was served from OpenAI's prefix cache"""
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None)
+        if cached_tokens:
+            self.logger.info(
+                f"Prompt cache served {cached_tokens} of {usage.prompt_tokens} input tokens")
+
+    async def _create_chat_completion(self, messages: list, max_tokens: int, stream: bool = False):
+        """Issue one rate-limited chat completion request.
+
+        Acquires budget from the client-side limiter before sending, uses
+        the raw-response API so the x-ratelimit headers can re-sync the
+        buckets afterwards, and on a 429 sleeps exactly the server-provided
+        retry-after instead of backing off blindly. With stream=True the
+        chunk iterator is returned instead of a parsed completion.
+        """
+        estimated_tokens = sum(len(m["content"]) for m in messages) // 4 + max_tokens
+
+        for attempt in range(3):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                if stream:
+                    return await self.client.chat.completions.create(
+                        model="gpt-3.5-turbo",  # or "gpt-4" if available
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=0.7,
+                        stream=True
+                    )
+                raw = await self.client.chat.completions.with_raw_response.create(
+                    model="gpt-3.5-turbo",  # or "gpt-4" if available
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.7
+                )
+                self.rate_limiter.update_from_headers(raw.headers)
+                response = raw.parse()
+                self._log_prompt_cache_usage(response)
+                return response
+            except openai.RateLimitError as e:
+                if attempt == 2:
+                    raise
+                try:
+                    retry_after = float(e.response.headers.get("retry-after", 1.0))
+                except (TypeError, ValueError):
+                    retry_after = 1.0
+                self.logger.warning(f"Rate limited by API; retrying in {retry_after:.1f}s")
+                await asyncio.sleep(retry_after)
+
+    async def call_openai_api(self, prompt: str, context: str = "", max_tokens: int = 1000,
+                              system: str = None, on_delta=None) -> Optional[str]:
+        """Call OpenAI API with the given prompt.
+
+        When on_delta is given the completion is streamed and the callback
+        is invoked with the accumulated text as tokens arrive, so callers
+        can show partial output long before the full response is done.
+        """
         try:
             full_prompt = f"{context}\n\nUser request: {prompt}" if context else prompt
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",  # or "gpt-4" if available
-                messages=[
-                    {"role": "system", "content": "You are an AI writing assistant integrated into LibreOffice Writer. Help users improve their documents by rewriting, editing, and enhancing text. Provide clear, concise responses."},
+            system_message = system or SYSTEM_MESSAGE
+
+            # Check the cache before paying for an API round-trip: first an
+            # exact hash lookup, then a semantic near-match on the embedding.
+            cache_key = ResponseCache.make_key(f"{system_message}\x00{full_prompt}")
+            cached = self.response_cache.get_exact(cache_key)
+            if cached is not None:
+                self.logger.info("Response cache hit (exact)")
+                if on_delta:
+                    on_delta(cached)
+                return cached
+
+            # Single-flight: if an identical prompt is already in flight,
+            # await its future instead of issuing a duplicate upstream call.
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                self.logger.info("Identical request already in flight; sharing its result")
+                result = await inflight
+                if result and on_delta:
+                    on_delta(result)
+                return result
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+            result = None
+            try:
+                embedding = await self._get_prompt_embedding(full_prompt)
+                cached = self.response_cache.get_semantic(embedding)
+                if cached is not None:
+                    self.logger.info("Response cache hit (semantic)")
+                    if on_delta:
+                        on_delta(cached)
+                    result = cached
+                    return result
+
+                messages = [
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": full_prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content.strip()
-        
+                ]
+
+                if on_delta:
+                    stream = await self._create_chat_completion(
+                        messages=messages, max_tokens=max_tokens, stream=True)
+                    parts = []
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            parts.append(delta)
+                            on_delta("".join(parts))
+                    result = "".join(parts).strip()
+                else:
+                    response = await self._create_chat_completion(
+                        messages=messages, max_tokens=max_tokens)
+                    result = response.choices[0].message.content.strip()
+
+                if result:
+                    self.response_cache.put(cache_key, embedding, result)
+                return result
+            finally:
+                # Waiters see None if the request failed; the exception is
+                # handled (and logged) by the caller below.
+                future.set_result(result)
+                self._inflight.pop(cache_key, None)
+
         except Exception as e:
             self.logger.error(f"OpenAI API call failed: {e}")
             return None
     
-    def process_user_command(self, command: str) -> Dict[str, Any]:
-        """Process a user command and return the result"""
-        command = command.lower().strip()
-        
-        if "rewrite" in command or "improve" in command:
-            return self._handle_rewrite_command(command)
-        elif "summarize" in command:
-            return self._handle_summarize_command(command)
-        elif "expand" in command or "elaborate" in command:
-            return self._handle_expand_command(command)
-        elif "correct" in command or "fix" in command:
-            return self._handle_correct_command(command)
-        else:
-            return self._handle_general_command(command)
-    
-    def _handle_rewrite_command(self, command: str) -> Dict[str, Any]:
-        """Handle rewrite/improve commands"""
-        selected_text = self.get_selected_text()
-        
-        if not selected_text:
+    BATCH_SYSTEM_MESSAGE = ("You are an AI writing assistant integrated into LibreOffice Writer. "
+                            "The user message contains an instruction and a numbered list of text passages. "
+                            "Apply the instruction to every passage independently and respond with only a "
+                            "JSON object of the form {\"results\": [\"...\"]} containing one edited passage "
+                            "per input, in the same order.")
+
+    async def _call_openai_batch(self, instruction: str, texts: list,
+                                 task: str = "rewrite") -> Optional[list]:
+        """Apply one instruction to several texts in a single API call.
+
+        The texts are sent as a numbered list and the model is asked to
+        reply with a JSON array, so N selections cost one HTTP round-trip
+        instead of N. Falls back to one call per text if the batched
+        response cannot be parsed.
+        """
+        numbered = "\n".join(f"{i + 1}. {text}" for i, text in enumerate(texts))
+        prompt = PROMPT_BATCH.format(instruction=instruction, passages=numbered)
+
+        raw = await self.call_openai_api(prompt, max_tokens=budget_for(task, "\n".join(texts)),
+                                         system=self.BATCH_SYSTEM_MESSAGE)
+        if raw:
+            try:
+                results = json.loads(raw).get("results")
+                if isinstance(results, list) and len(results) == len(texts):
+                    return [str(result) for result in results]
+            except (json.JSONDecodeError, AttributeError):
+                pass
+            self.logger.warning("Batched response was not valid JSON; falling back to per-range calls")
+
+        results = []
+        for text in texts:
+            result = await self.call_openai_api(f"{instruction}: {text}",
+                                                max_tokens=budget_for(task, text))
+            if not result:
+                return None
+            results.append(result)
+        return results
+
+    def _edit_selected_ranges(self, instruction: str, success_message: str,
+                              task: str = "rewrite") -> Dict[str, Any]:
+        """Apply an instruction to every selected range and write back the results"""
+        ranges = self.get_selected_ranges()
+        texts = [text_range.getString() for text_range in ranges]
+
+        if not ranges or not any(text.strip() for text in texts):
             return {
                 "status": "error",
-                "message": "Please select text to rewrite"
+                "message": "Please select text to edit"
             }
-        
-        # Extract specific instructions from command
-        if "simpler" in command or "simple" in command:
-            prompt = f"Rewrite this text in simpler words: {selected_text}"
-        elif "formal" in command:
-            prompt = f"Rewrite this text in a more formal tone: {selected_text}"
-        elif "casual" in command:
-            prompt = f"Rewrite this text in a more casual tone: {selected_text}"
-        else:
-            prompt = f"Improve and rewrite this text: {selected_text}"
-        
+
         try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.call_openai_api(prompt))
-            loop.close()
-            
-            if result:
-                self.replace_selected_text(result)
+            if len(texts) == 1:
+                text_range = ranges[0]
+                last_flush = [0.0]
+
+                def _show_partial(accumulated):
+                    # Throttle UNO writes: repaint the selection at most
+                    # every 50 ms so streaming does not flood the bridge.
+                    now = time.monotonic()
+                    if now - last_flush[0] >= 0.05:
+                        last_flush[0] = now
+                        text_range.setString(accumulated)
+
+                result = self._run_async(
+                    self.call_openai_api(f"{instruction}: {texts[0]}",
+                                         max_tokens=budget_for(task, texts[0]),
+                                         on_delta=_show_partial))
+                results = [result] if result else None
+            else:
+                results = self._run_async(
+                    self._call_openai_batch(instruction, texts, task=task))
+
+            if results:
+                for text_range, new_text in zip(ranges, results):
+                    text_range.setString(new_text)
                 return {
                     "status": "success",
-                    "message": "Text rewritten successfully",
-                    "original": selected_text,
-                    "result": result
+                    "message": success_message,
+                    "original": texts[0] if len(texts) == 1 else texts,
+                    "result": results[0] if len(results) == 1 else results
                 }
             else:
                 return {
@@ -242,29 +811,72 @@ class AIAgentService:
                 "status": "error",
                 "message": f"Error processing command: {str(e)}"
             }
+
+    # Keyword routing table, built once at import time: commands are
+    # dispatched by hashing their tokens instead of re-scanning the whole
+    # string for every known keyword.
+    _COMMAND_HANDLERS = {
+        "rewrite": "_handle_rewrite_command",
+        "improve": "_handle_rewrite_command",
+        "summarize": "_handle_summarize_command",
+        "expand": "_handle_expand_command",
+        "elaborate": "_handle_expand_command",
+        "correct": "_handle_correct_command",
+        "fix": "_handle_correct_command",
+    }
+
+    def process_user_command(self, command: str) -> Dict[str, Any]:
+        """Process a user command and return the result"""
+        command = command.lower().strip()
+
+        # Strip punctuation so "summarize." routes like "summarize"
+        # instead of falling through to the general handler.
+        for token in command.split():
+            handler = self._COMMAND_HANDLERS.get(token.strip(string.punctuation))
+            if handler:
+                return getattr(self, handler)(command)
+        return self._handle_general_command(command)
+    
+    # Tone keywords recognized inside rewrite/improve commands
+    _REWRITE_INSTRUCTIONS = {
+        "simpler": PROMPT_REWRITE_SIMPLE,
+        "simple": PROMPT_REWRITE_SIMPLE,
+        "formal": PROMPT_REWRITE_FORMAL,
+        "casual": PROMPT_REWRITE_CASUAL,
+    }
+
+    def _handle_rewrite_command(self, command: str) -> Dict[str, Any]:
+        """Handle rewrite/improve commands"""
+        # Extract specific instructions from command
+        instruction = PROMPT_REWRITE_DEFAULT
+        for token in command.split():
+            token = token.strip(string.punctuation)
+            if token in self._REWRITE_INSTRUCTIONS:
+                instruction = self._REWRITE_INSTRUCTIONS[token]
+                break
+
+        return self._edit_selected_ranges(instruction, "Text rewritten successfully")
     
     def _handle_summarize_command(self, command: str) -> Dict[str, Any]:
         """Handle summarization commands"""
         selected_text = self.get_selected_text()
-        
-        if not selected_text:
-            # If no selection, try to summarize the whole document
-            selected_text = self.get_document_text()
-            if not selected_text:
-                return {
-                    "status": "error",
-                    "message": "No text to summarize"
-                }
-        
-        prompt = f"Summarize this text concisely: {selected_text}"
-        
+
         try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.call_openai_api(prompt))
-            loop.close()
-            
+            if selected_text:
+                result = self._run_async(self.call_openai_api(
+                    PROMPT_SUMMARIZE.format(text=selected_text),
+                    max_tokens=budget_for("summarize", selected_text)))
+            else:
+                # If no selection, summarize the whole document — chunked,
+                # so neither the UNO transfer nor the prompt is unbounded
+                chunks = self._collect_text_chunks()
+                if not chunks:
+                    return {
+                        "status": "error",
+                        "message": "No text to summarize"
+                    }
+                result = self._run_async(self._summarize_chunks(chunks))
+
             if result:
                 # Insert summary at cursor position
                 self.insert_text_at_cursor(f"\n\nSummary: {result}\n\n")
@@ -286,89 +898,27 @@ class AIAgentService:
     
     def _handle_expand_command(self, command: str) -> Dict[str, Any]:
         """Handle expand/elaborate commands"""
-        selected_text = self.get_selected_text()
-        
-        if not selected_text:
-            return {
-                "status": "error",
-                "message": "Please select text to expand"
-            }
-        
-        prompt = f"Expand and elaborate on this text with more details: {selected_text}"
-        
-        try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.call_openai_api(prompt, max_tokens=1500))
-            loop.close()
-            
-            if result:
-                self.replace_selected_text(result)
-                return {
-                    "status": "success",
-                    "message": "Text expanded successfully",
-                    "result": result
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": "Failed to expand text"
-                }
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Error processing command: {str(e)}"
-            }
-    
+        return self._edit_selected_ranges(
+            PROMPT_EXPAND, "Text expanded successfully", task="expand")
+
     def _handle_correct_command(self, command: str) -> Dict[str, Any]:
         """Handle grammar/spelling correction commands"""
-        selected_text = self.get_selected_text()
-        
-        if not selected_text:
-            return {
-                "status": "error",
-                "message": "Please select text to correct"
-            }
-        
-        prompt = f"Correct any grammar, spelling, and punctuation errors in this text: {selected_text}"
-        
-        try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.call_openai_api(prompt))
-            loop.close()
-            
-            if result:
-                self.replace_selected_text(result)
-                return {
-                    "status": "success",
-                    "message": "Text corrected successfully",
-                    "result": result
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": "Failed to correct text"
-                }
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Error processing command: {str(e)}"
-            }
+        return self._edit_selected_ranges(
+            PROMPT_CORRECT, "Text corrected successfully", task="correct")
     
     def _handle_general_command(self, command: str) -> Dict[str, Any]:
         """Handle general AI commands"""
         context = self.get_selected_text() or ""
-        
+
         try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.call_openai_api(command, context))
-            loop.close()
-            
+            # The catch-all path can be purely generative ("write a
+            # conclusion paragraph") with almost no input to scale from,
+            # so keep a generation-sized floor here; input-scaled budgets
+            # only make sense where output tracks input.
+            result = self._run_async(self.call_openai_api(
+                command, context,
+                max_tokens=budget_for("general", command + context, minimum=1000)))
+
             if result:
                 if context:
                     # If there was selected text, replace it
@@ -393,72 +943,97 @@ class AIAgentService:
                 "message": f"Error processing command: {str(e)}"
             }
     
+    async def _serve(self):
+        """Run the command server on the persistent event loop"""
+        if self.use_unix_socket:
+            # Remove a stale socket file left behind by a previous run
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+            server = await asyncio.start_unix_server(
+                self._handle_client_async, path=self.socket_path)
+            self.logger.info(f"AI Agent server listening on {self.socket_path}")
+        else:
+            server = await asyncio.start_server(
+                self._handle_client_async, 'localhost', self.port)
+            self.logger.info(f"AI Agent server listening on port {self.port}")
+
+        self.socket_server = server
+        async with server:
+            await server.serve_forever()
+
     def start_socket_server(self):
-        """Start socket server for external communication"""
+        """Start the socket server and block until the service stops"""
         self.running = True
-        self.socket_server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket_server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
+        future = asyncio.run_coroutine_threadsafe(self._serve(), self._loop)
         try:
-            self.socket_server.bind(('localhost', self.port))
-            self.socket_server.listen(5)
-            self.logger.info(f"AI Agent server listening on port {self.port}")
-            
-            while self.running:
-                try:
-                    client_socket, address = self.socket_server.accept()
-                    self.logger.info(f"Client connected from {address}")
-                    
-                    # Handle client in separate thread
-                    thread = threading.Thread(target=self._handle_client, args=(client_socket,))
-                    thread.daemon = True
-                    thread.start()
-                    
-                except socket.error:
-                    if self.running:
-                        self.logger.error("Socket error occurred")
-                    break
-                    
+            future.result()
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
             self.logger.error(f"Server error: {e}")
-        finally:
-            if self.socket_server:
-                self.socket_server.close()
-    
-    def _handle_client(self, client_socket):
-        """Handle client connection"""
+
+    async def _handle_client_async(self, reader, writer):
+        """Handle one client connection as a coroutine.
+
+        Connections are persistent and each message is framed with a
+        4-byte big-endian length prefix, matching AIClient. Connection
+        I/O multiplexes on the event loop, so clients cost a coroutine
+        rather than an OS thread each; command processing blocks on UNO
+        and is pushed to the default executor instead of the loop.
+        """
+        sock = writer.get_extra_info('socket')
+        if sock is not None and not self.use_unix_socket:
+            # asyncio already disables Nagle on TCP transports; also keep
+            # idle pooled connections alive.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        address = writer.get_extra_info('peername') or writer.get_extra_info('sockname')
+        self.logger.info(f"Client connected from {address}")
+
         try:
             while True:
-                data = client_socket.recv(4096)
-                if not data:
+                # A clean disconnect shows up as EOF on the frame boundary
+                try:
+                    header = await reader.readexactly(4)
+                except asyncio.IncompleteReadError:
                     break
-                
+                length = struct.unpack("!I", header)[0]
+                data = await reader.readexactly(length)
+
                 try:
                     request = json.loads(data.decode('utf-8'))
                     command = request.get('command', '')
-                    
-                    result = self.process_user_command(command)
-                    
-                    response = json.dumps(result)
-                    client_socket.send(response.encode('utf-8'))
-                    
+
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        None, self.process_user_command, command)
+
+                    payload = json.dumps(result).encode('utf-8')
                 except json.JSONDecodeError:
-                    error_response = json.dumps({
+                    payload = json.dumps({
                         "status": "error",
                         "message": "Invalid JSON request"
-                    })
-                    client_socket.send(error_response.encode('utf-8'))
-                    
+                    }).encode('utf-8')
+
+                writer.write(struct.pack("!I", len(payload)) + payload)
+                await writer.drain()
+
         except Exception as e:
             self.logger.error(f"Client handling error: {e}")
         finally:
-            client_socket.close()
+            writer.close()
     
     def stop(self):
         """Stop the AI agent service"""
         self.running = False
         if self.socket_server:
-            self.socket_server.close()
+            self._loop.call_soon_threadsafe(self.socket_server.close)
+        if self.use_unix_socket:
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
 
 
 def main():
@@ -468,16 +1043,24 @@ def main():
     parser = argparse.ArgumentParser(description="LibreOffice Writer AI Agent")
     parser.add_argument('--api-key', help='OpenAI API key')
     parser.add_argument('--port', type=int, default=8765, help='Socket server port (default: 8765)')
-    
+    parser.add_argument('--socket-path', default=DEFAULT_SOCKET_PATH,
+                        help=f'UNIX domain socket path (default: {DEFAULT_SOCKET_PATH})')
+    parser.add_argument('--tcp', action='store_true',
+                        help='Use TCP loopback instead of a UNIX domain socket')
+
     args = parser.parse_args()
-    
+
     try:
-        agent = AIAgentService(openai_api_key=args.api_key, port=args.port)
-        
+        agent = AIAgentService(openai_api_key=args.api_key, port=args.port,
+                               socket_path=args.socket_path, use_tcp=args.tcp)
+
         print("Starting LibreOffice Writer AI Agent...")
         print("Make sure LibreOffice Writer is running with:")
         print("soffice --writer --accept='socket,host=localhost,port=2002;urp;StarOffice.ServiceManager' --nologo --nodefault --nolockcheck --norestore")
-        print(f"AI Agent listening on port {args.port}")
+        if agent.use_unix_socket:
+            print(f"AI Agent listening on {args.socket_path}")
+        else:
+            print(f"AI Agent listening on port {args.port}")
         
         agent.start_socket_server()
         
@@ -5,39 +5,119 @@ Simple client to test AI agent communication
 
 import json
 import socket
+import struct
 import sys
 
 
-def send_command(command: str, host: str = 'localhost', port: int = 8765):
-    """Send a command to the AI agent"""
+# Keep in sync with ai_agent.DEFAULT_SOCKET_PATH
+DEFAULT_SOCKET_PATH = "/tmp/ai-office.sock"
+
+
+class AIClient:
+    """Persistent connection to the AI agent.
+
+    Keeps one socket open across commands so callers looping over many
+    commands skip the per-command connect/teardown, and frames every
+    message with a 4-byte big-endian length prefix so responses larger
+    than one recv() buffer are not truncated.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 8765,
+                 socket_path: str = DEFAULT_SOCKET_PATH, use_tcp: bool = False):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.use_tcp = use_tcp
+        self.sock = None
+
+    def connect(self):
+        """Open the connection if it is not already open"""
+        if self.sock is not None:
+            return
+
+        # Prefer the UNIX domain socket for same-host IPC; TCP loopback
+        # remains available for Windows or remote agents.
+        if hasattr(socket, 'AF_UNIX') and not self.use_tcp:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(self.socket_path)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.connect((self.host, self.port))
+            # Small JSON messages: disable Nagle so requests go out
+            # immediately instead of stalling on delayed ACKs.
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    def close(self):
+        """Close the connection"""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _write_frame(self, payload: bytes):
+        """Send one length-prefixed frame"""
+        self.sock.sendall(struct.pack("!I", len(payload)) + payload)
+
+    def _recv_exact(self, count: int) -> bytes:
+        """Receive exactly count bytes, looping over short reads"""
+        chunks = []
+        while count:
+            chunk = self.sock.recv(min(count, 65536))
+            if not chunk:
+                raise ConnectionError("Connection closed by agent")
+            chunks.append(chunk)
+            count -= len(chunk)
+        return b"".join(chunks)
+
+    def _read_frame(self) -> bytes:
+        """Receive one length-prefixed frame"""
+        header = self._recv_exact(4)
+        length = struct.unpack("!I", header)[0]
+        return self._recv_exact(length)
+
+    def send(self, command: str) -> dict:
+        """Send a command to the AI agent and return the decoded response"""
+        self.connect()
+        self._write_frame(json.dumps({"command": command}).encode('utf-8'))
+        return json.loads(self._read_frame().decode('utf-8'))
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def send_command(command: str, host: str = 'localhost', port: int = 8765,
+                 socket_path: str = DEFAULT_SOCKET_PATH, use_tcp: bool = False):
+    """Send a single command to the AI agent"""
+    client = AIClient(host=host, port=port, socket_path=socket_path, use_tcp=use_tcp)
     try:
-        client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client_socket.connect((host, port))
-        
-        request = {"command": command}
-        client_socket.send(json.dumps(request).encode('utf-8'))
-        
-        response = client_socket.recv(4096)
-        result = json.loads(response.decode('utf-8'))
-        
-        client_socket.close()
-        return result
-        
+        return client.send(command)
+
     except Exception as e:
         return {"status": "error", "message": f"Connection error: {e}"}
+    finally:
+        client.close()
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python ai_client.py <command>")
+    args = sys.argv[1:]
+    use_tcp = '--tcp' in args
+    if use_tcp:
+        args.remove('--tcp')
+
+    if not args:
+        print("Usage: python ai_client.py [--tcp] <command>")
         print("Example: python ai_client.py 'rewrite in simpler words'")
         sys.exit(1)
-    
-    command = ' '.join(sys.argv[1:])
-    result = send_command(command)
-    
+
+    command = ' '.join(args)
+    result = send_command(command, use_tcp=use_tcp)
+
     print(json.dumps(result, indent=2))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
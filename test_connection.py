@@ -6,100 +6,144 @@ Simple test script to verify LibreOffice Writer AI integration
 import sys
 import time
 import os
+import socket
+import logging
+from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
 
-def test_libreoffice_connection():
+# Status lines go through a buffered logger and reach the console in one
+# write at the end of the run: one kernel write instead of ~20, and the
+# Windows console only re-encodes the emoji symbols once.
+log = logging.getLogger("aiotest")
+_log_buffer = StringIO()
+log.addHandler(logging.StreamHandler(_log_buffer))
+log.setLevel(logging.INFO)
+log.propagate = False
+
+
+def flush_log():
+    """Write everything logged so far to stdout in a single call"""
+    sys.stdout.write(_log_buffer.getvalue())
+    sys.stdout.flush()
+    _log_buffer.seek(0)
+    _log_buffer.truncate(0)
+
+# Import once at module scope: the first `import uno` scans the URE type
+# libraries (hundreds of ms cold), so paying it per function call adds up.
+try:
+    import uno
+except ImportError:
+    uno = None
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+def test_libreoffice_connection(out=sys.stdout):
     """Test if we can connect to LibreOffice"""
+    if uno is None:
+        print("✗ UNO library not found. LibreOffice SDK may not be properly installed.", file=out)
+        return False
+    print("✓ UNO library found", file=out)
+
+    # Fail fast when soffice isn't up: a cheap TCP preflight answers in
+    # under a millisecond, instead of waiting seconds for the UNO
+    # resolver to time out deep inside the bridge.
     try:
-        import uno
-        print("✓ UNO library found")
-        
-        # Connect to LibreOffice
-        local_ctx = uno.getComponentContext()
-        resolver = local_ctx.ServiceManager.createInstanceWithContext(
-            "com.sun.star.bridge.UnoUrlResolver", local_ctx)
-        
-        print("Attempting to connect to LibreOffice...")
-        try:
-            ctx = resolver.resolve(
-                "uno:socket,host=localhost,port=2002;urp;StarOffice.ComponentContext")
-            print("✓ Connected to LibreOffice successfully!")
-            
-            # Get desktop
-            desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
-            
-            # Get current document
-            doc = desktop.getCurrentComponent()
-            if doc and hasattr(doc, 'Text'):
-                print("✓ Writer document is active!")
-                
-                # Try to insert some text
-                text = doc.getText()
-                cursor = text.createTextCursor()
-                cursor.setString("Hello from AI Agent! This text was inserted by the Python script.\n\n")
-                
-                print("✓ Successfully inserted text into document!")
-                return True
-            else:
-                print("⚠ No Writer document found. Please open LibreOffice Writer.")
-                return False
-                
-        except Exception as e:
-            print(f"✗ Failed to connect to LibreOffice: {e}")
-            print("Make sure LibreOffice is running with UNO bridge enabled.")
-            return False
-            
-    except ImportError:
-        print("✗ UNO library not found. LibreOffice SDK may not be properly installed.")
+        socket.create_connection(("localhost", 2002), timeout=0.5).close()
+    except OSError:
+        print("✗ soffice not listening on 2002", file=out)
+        print("Make sure LibreOffice is running with UNO bridge enabled.", file=out)
         return False
 
-def test_openai_setup():
-    """Test OpenAI setup"""
+    print("Attempting to connect to LibreOffice...", file=out)
     try:
-        import openai
-        print("✓ OpenAI library found")
-        
-        # Check for API key
-        api_key = os.getenv('OPENAI_API_KEY')
-        if api_key and api_key.startswith('sk-'):
-            print("✓ OpenAI API key found in environment")
+        # The bridge handshake is memoized in uno_bridge, so repeated
+        # calls in the same process reuse the connection.
+        from uno_bridge import get_desktop
+        desktop = get_desktop()
+        print("✓ Connected to LibreOffice successfully!", file=out)
+
+        # Get current document
+        doc = desktop.getCurrentComponent()
+        if doc and doc.supportsService("com.sun.star.text.TextDocument"):
+            print("✓ Writer document is active!", file=out)
+
+            # Try to insert some text
+            text = doc.getText()
+            cursor = text.createTextCursor()
+            cursor.setString("Hello from AI Agent! This text was inserted by the Python script.\n\n")
+
+            print("✓ Successfully inserted text into document!", file=out)
             return True
         else:
-            print("⚠ OpenAI API key not found in environment. Set OPENAI_API_KEY variable.")
-            print("  You can still test LibreOffice connection without AI features.")
+            print("⚠ No Writer document found. Please open LibreOffice Writer.", file=out)
             return False
-            
-    except ImportError:
-        print("✗ OpenAI library not found. Install with: pip install openai")
+
+    except Exception as e:
+        print(f"✗ Failed to connect to LibreOffice: {e}", file=out)
+        print("Make sure LibreOffice is running with UNO bridge enabled.", file=out)
+        return False
+
+def test_openai_setup(out=sys.stdout):
+    """Test OpenAI setup"""
+    if openai is None:
+        print("✗ OpenAI library not found. Install with: pip install openai", file=out)
+        return False
+    print("✓ OpenAI library found", file=out)
+
+    # Check for API key
+    api_key = os.getenv('OPENAI_API_KEY')
+    if api_key and api_key.startswith('sk-'):
+        print("✓ OpenAI API key found in environment", file=out)
+        return True
+    else:
+        print("⚠ OpenAI API key not found in environment. Set OPENAI_API_KEY variable.", file=out)
+        print("  You can still test LibreOffice connection without AI features.", file=out)
         return False
 
 def main():
-    print("LibreOffice Writer AI Agent - Connection Test")
-    print("=" * 50)
+    log.info("LibreOffice Writer AI Agent - Connection Test")
+    log.info("=" * 50)
     
-    # Test LibreOffice connection
-    print("\n1. Testing LibreOffice Connection:")
-    lo_ok = test_libreoffice_connection()
-    
-    # Test OpenAI setup
-    print("\n2. Testing OpenAI Setup:")
-    openai_ok = test_openai_setup()
-    
-    print("\n" + "=" * 50)
+    # The two checks are independent: the LibreOffice one blocks on a TCP
+    # connect to localhost:2002, the OpenAI one is import + env-var. Run
+    # them concurrently so wall time is max(a, b) instead of a + b; each
+    # check prints into its own buffer so the output doesn't interleave.
+    lo_out, openai_out = StringIO(), StringIO()
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_lo = ex.submit(test_libreoffice_connection, lo_out)
+        f_ai = ex.submit(test_openai_setup, openai_out)
+        lo_ok, openai_ok = f_lo.result(), f_ai.result()
+
+    log.info("\n1. Testing LibreOffice Connection:")
+    log.info(lo_out.getvalue().rstrip('\n'))
+
+    log.info("\n2. Testing OpenAI Setup:")
+    log.info(openai_out.getvalue().rstrip('\n'))
+
+    log.info("\n" + "=" * 50)
     if lo_ok:
-        print("✓ LibreOffice connection successful!")
+        log.info("✓ LibreOffice connection successful!")
         if openai_ok:
-            print("✓ Ready for AI-powered writing assistance!")
+            log.info("✓ Ready for AI-powered writing assistance!")
         else:
-            print("⚠ AI features require OpenAI API key")
+            log.info("⚠ AI features require OpenAI API key")
     else:
-        print("✗ LibreOffice connection failed")
-        print("\nTroubleshooting:")
-        print("1. Make sure LibreOffice Writer is open")
-        print("2. Restart LibreOffice with UNO bridge:")
-        print('   Start-Process "C:\\Program Files\\LibreOffice\\program\\soffice.exe" -ArgumentList "--writer", "--accept=socket,host=localhost,port=2002;urp;StarOffice.ServiceManager"')
+        log.info("✗ LibreOffice connection failed")
+        log.info("\nTroubleshooting:")
+        log.info("1. Make sure LibreOffice Writer is open")
+        log.info("2. Restart LibreOffice with UNO bridge:")
+        log.info('   Start-Process "C:\\Program Files\\LibreOffice\\program\\soffice.exe" -ArgumentList "--writer", "--accept=socket,host=localhost,port=2002;urp;StarOffice.ServiceManager"')
     
-    print("\nPress Enter to continue...")
-    input()
+    flush_log()
+
+    # Only pause for a human: blocking on input() hangs CI and piped
+    # batch runs indefinitely.
+    if sys.stdin.isatty() and not os.environ.get("CI"):
+        print("\nPress Enter to continue...")
+        input()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
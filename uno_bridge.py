@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Shared, memoized UNO bridge setup for the AI agent scripts
+"""
+
+from functools import lru_cache
+
+UNO_CONNECT_URL = "uno:socket,host=localhost,port=2002;urp;StarOffice.ComponentContext"
+
+
+@lru_cache(maxsize=1)
+def get_ctx():
+    """Resolve the LibreOffice component context, once per process.
+
+    The resolve step is a TCP connect plus UNO handshake on port 2002 and
+    is the single slowest step in these scripts; caching it makes every
+    later UNO operation in the same process skip the handshake entirely.
+    """
+    import uno
+
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_ctx)
+    return resolver.resolve(UNO_CONNECT_URL)
+
+
+@lru_cache(maxsize=1)
+def get_desktop():
+    """Get the Desktop service on the cached bridge connection"""
+    ctx = get_ctx()
+    return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)